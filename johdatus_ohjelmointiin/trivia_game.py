@@ -3,24 +3,32 @@ Trivia Quiz Game
 
 This script serves as the entry point for running the trivia quiz game. It 
 relies on helper functions defined in `trivia_game_helpers.py` for fetching 
-questions, conducting the quiz, and writing the results to a CSV file.
+questions, conducting the quiz, and writing the results to a zstd compressed
+CSV file `quiz_score.csv.zst`. Decompress it (e.g. `zstd -d 
+quiz_score.csv.zst`) to read it, or call `write_score_to_csv` with 
+`compress=False` to get a plain `quiz_score.csv`.
 
 Helper functions:
     - `get_questions`: Fetches trivia questions from the Open Trivia Database 
        API.
     - `quiz`: Conducts the quiz with multiple players and tracks their scores.
     - `calculate_winner`: Calculates and declears the winner.
-    - `write_score_to_csv`: Saves player scores to a CSV file.
+    - `write_score_to_csv`: Saves player scores to a zstd compressed CSV 
+      file.
 
 Usage:
-    Run this script to start a trivia quiz with multiple players.
+    Run this script to start a trivia quiz with multiple players. The 
+    questions are fetched in the background while the players enter their 
+    names.
     Example:
         python trivia_game.py
 
 Dependencies:
     - trivia_game_helpers: Contains the helper functions used in this script.
+    - numpy: Used by `quiz` to keep the scores in a matrix.
     - requests: Used by `get_questions` to fetch trivia questions from the Open
       Trivia Database API.
+    - pyarrow: Used by `write_score_to_csv` to write the scores to a CSV file.
 
 Author: Maria Aho
 Date: 2024-09-05
@@ -28,6 +36,8 @@ Date: 2024-09-05
 
 # Docstring was provided by ChatGPT AI and edited by the author
 
+from concurrent.futures import ThreadPoolExecutor
+
 import trivia_game_helpers as helpers
 
 
@@ -35,6 +45,8 @@ import trivia_game_helpers as helpers
 # Get information about the players, and the game length
 print("Welcome to a trivia game!")
 player_list = []
+# Set of the same names for fast checking of taken names
+player_set = set()
 # Ask for the number of players until a number is given
 while True:
     try:
@@ -42,17 +54,6 @@ while True:
         break
     except ValueError:
         print("Please, give a number")
-number = 0
-for player in range(no_players):
-    number += 1
-    # Ask for each player's name, and only accept a unique name
-    while True:
-        name = input(f"Player {number} name: ")
-        if name not in player_list:
-            player_list.append(name)
-            break
-        else:
-            print("The name is already taken. Please give another name.\n")
 
 # Ask for the number of questions until a number <= 50 is given
 while True:
@@ -63,24 +64,52 @@ while True:
     except ValueError:
         print("Please, give a number")
     if no_questions <= 50:
-        print(
-            f"\nThank you! Lets play the trivia game. All the contestants get" 
-            f" to answer the same {no_questions} questions. Each correct "
-            f"answer will earn you 1 point. If you don't know, guess! Eternal " 
-            f"glory awaits whoever wins!\n")
         break
     else: 
         print("Sorry, the maximum number of questions is 50.")
 
-
-# Get the quiz questions and answers from open trivia API:
-response = helpers.get_questions(no_questions)
+# Start getting the quiz questions and answers from open trivia API in the 
+# background, so the request is done while the players type their names
+with ThreadPoolExecutor(max_workers=1) as executor:
+    questions_future = executor.submit(helpers.get_questions, no_questions)
+
+    number = 0
+    for player in range(no_players):
+        number += 1
+        # Ask for each player's name, and only accept a unique name
+        while True:
+            name = input(f"Player {number} name: ")
+            if name not in player_set:
+                player_list.append(name)
+                player_set.add(name)
+                break
+            else:
+                print(
+                    "The name is already taken. Please give another name.\n"
+                    )
+
+    print(
+        f"\nThank you! Lets play the trivia game. All the contestants get" 
+        f" to answer the same {no_questions} questions. Each correct "
+        f"answer will earn you 1 point. If you don't know, guess! Eternal " 
+        f"glory awaits whoever wins!\n")
+
+    # Wait for the quiz questions and answers from open trivia API
+    response = questions_future.result()
+
+# Tell about a failed API call here, and not in the background thread, so the
+# message doesn't get mixed with the name prompts
+if response.status_code != 200:
+    print(
+        f"Something went wrong! Didn't get the questions, got status code "
+        f"{response.status_code}"
+        )
 
 # Do the quiz for all the players, and save the results in 'score'
-score = helpers.quiz(response, player_list)
+player_list, score = helpers.quiz(response, player_list)
 
 # Calculate and publish the winner(s)
-helpers.calculate_winner(score)
+helpers.calculate_winner(player_list, score)
 
-# Write the score to a csv file
-helpers.write_score_to_csv(score)
\ No newline at end of file
+# Write the score to a compressed csv file
+helpers.write_score_to_csv(player_list, score)
\ No newline at end of file
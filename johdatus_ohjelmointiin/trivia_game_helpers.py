@@ -9,53 +9,167 @@ Functions:
     - get_questions: Fetch trivia questions from the API.
     - quiz: Conduct the quiz and track player scores.
     - calculate_winner: Calculates and declears the winner.
-    - write_score_to_csv: Export the player scores to a CSV file.
+    - write_score_to_csv: Export the player scores to a (zstd compressed) CSV
+      or Arrow file.
 
 Dependencies:
     - requests: Required for fetching trivia questions from the API.
+    - numpy: Required for keeping the player scores in a matrix.
+    - pyarrow: Required for writing the player scores to a CSV or Arrow file.
 
 Author: Maria Aho
 Date: 2024-09-05
 """
 
-import csv
+from collections import OrderedDict
+from functools import wraps
 from html import unescape
 import json
+import os
 from random import shuffle
+import sys
+import time
 
-from requests import get
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import pyarrow.feather as feather
+from requests import Session
+from requests.adapters import HTTPAdapter
 
 
 # The docstrings were written by ChatGPT AI, and edited by the author.
 
+# One shared HTTP session, so the connection to the API is kept alive and 
+# reused between the calls instead of opening a new one every time
+_session = Session()
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Cache for the API responses: {no_questions: {"value": ..., "ts": ...}}. 
+# The cache is only used when asked for (see `get_questions`), so the real 
+# game gets new questions every time. Entries older than _CACHE_TTL seconds, 
+# both in memory and on disk, are fetched again, and the least recently used
+# entry is dropped from memory when there are more than _CACHE_MAX_ENTRIES 
+# entries.
+_resp_cache = OrderedDict()
+_CACHE_TTL = 3600
+_CACHE_MAX_ENTRIES = 8
+
+
+class _CachedResponse:
+    """
+    A lightweight stand-in for `requests.Response` returned from the cache. It
+    only offers the parts of the response the quiz uses: `status_code` and 
+    `json()`.
+    """
+
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def _cache_path(no_questions):
+    """Returns the path of the on-disk cache file for `no_questions`."""
+    return os.path.join(
+        os.path.expanduser('~'), '.cache', 'trivia', f'{no_questions}.json'
+        )
+
+
+def _cached(fetch):
+    """
+    Decorator that caches the responses of `get_questions`.
+
+    Without `use_cache=True` (or the environment variable `TRIVIA_CACHE=1`) 
+    the API is always called. With the cache, the in-memory cache is checked 
+    first, then the JSON file on disk, and only if neither has fresh questions
+    the API is called. Successful API responses (status code 200 and 
+    `response_code` 0) are saved both in memory and on disk.
+    """
+    @wraps(fetch)
+    def wrapper(no_questions=3, use_cache=None):
+        if use_cache is None:
+            use_cache = os.environ.get('TRIVIA_CACHE') == '1'
+        if not use_cache:
+            return fetch(no_questions)
+
+        now = time.time()
+        path = _cache_path(no_questions)
+        entry = _resp_cache.get(no_questions)
+        if entry is None or now - entry["ts"] >= _CACHE_TTL:
+            entry = None
+            try:
+                with open(path, encoding='utf-8') as file:
+                    cached = json.load(file)
+                if now - cached["ts"] < _CACHE_TTL:
+                    entry = {"value": cached["value"], "ts": cached["ts"]}
+            except (OSError, ValueError, KeyError, TypeError):
+                # No usable cache file, the questions are fetched from the API
+                pass
+
+        if entry is None:
+            response = fetch(no_questions)
+            if response.status_code != 200:
+                return response
+            data = response.json()
+            # The API tells about errors (no results, rate limit etc.) with a 
+            # response code other than 0. Those must not be cached.
+            if data.get("response_code") != 0:
+                return response
+            entry = {"value": data, "ts": now}
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as file:
+                    json.dump(entry, file)
+            except OSError:
+                # The game works without the cache file, so don't fail here
+                pass
+
+        _resp_cache[no_questions] = entry
+        _resp_cache.move_to_end(no_questions)
+        while len(_resp_cache) > _CACHE_MAX_ENTRIES:
+            _resp_cache.popitem(last=False)
+        return _CachedResponse(entry["value"])
+    return wrapper
+
+
+@_cached
 def get_questions(no_questions=3):
     """
     Fetches trivia questions from the Open Trivia Database API.
 
-    This function makes a GET request to the Open Trivia Database API to 
-    retrieve a specified number of trivia questions. The number of questions 
+    This function makes a GET request to the Open Trivia Database API, using
+    a shared `requests.Session` that keeps the connection open, to retrieve a
+    specified number of trivia questions. The number of questions 
     can be customized, but it has a maximum limit of 50. By default, it fetches
     3 questions.
 
+    With `use_cache=True` (or the environment variable `TRIVIA_CACHE=1`) the
+    responses are cached for an hour in memory and on disk in 
+    `~/.cache/trivia/`, so repeated development runs don't have to wait for 
+    the API. The cache is off by default, so every game gets new questions.
+
     Args:
         no_questions (int): The number of trivia questions to retrieve. 
         Defaults to 3. Maximum is 50.
+        use_cache (bool): Whether to use the response cache. Defaults to the 
+        value of the environment variable `TRIVIA_CACHE` ('1' turns it on).
 
     Returns:
         requests.Response: The response object from the Open Trivia Database 
-        API, containing the trivia questions if the request is successful.
-
-    Raises:
-        Prints an error message if the API call fails (i.e., status code is not 
-        200).
+        API, containing the trivia questions if the request is successful. A 
+        cached response is a lightweight object with the same `status_code` 
+        and `json()`.
+
+    Note:
+        The function doesn't print anything if the API call fails (i.e., 
+        status code is not 200), because it may run in a background thread. 
+        The caller should check `response.status_code`.
     """
-    response = get(f'https://opentdb.com/api.php?amount={no_questions}')
-    if response.status_code != 200:
-        print(
-            f"Something went wrong! Didn't get the questions, got status code "
-            f"{response.status_code}"
-            )
-    return response
+    return _session.get(f'https://opentdb.com/api.php?amount={no_questions}')
 
 
 def quiz(response, player_list:list):
@@ -75,20 +189,21 @@ def quiz(response, player_list:list):
                             each trivia question.
 
     Returns:
-        dict: A dictionary where each key is a player's name, and each value is
-        a nested dictionary containing the player's score per question. The 
-        format is:
-            {
-                'player_name': {
-                    'question_number': points (1 for correct, 0 for incorrect)
-                }
-            }
+        tuple: A tuple `(player_list, score)`, where `score` is a 
+        `numpy.ndarray` of shape `(len(player_list), number of questions)` and
+        dtype `int8`. Row `i` holds the points of `player_list[i]`, and column
+        `j` the points for question `j + 1` (1 for correct, 0 for incorrect).
+
+    Raises:
+        EOFError: If stdin runs out before every player has answered every 
+                  question.
 
     Flow:
-        - The function starts by initializing a `score` dictionary to track 
-          each player's points.
-        - It processes each question from the `response`, cleaning HTML 
-          entities and shuffling answer choices.
+        - The function starts by initializing a `score` matrix of zeros to 
+          track each player's points.
+        - It cleans the HTML entities of all the questions and answers in the
+          `response` at once, and then goes through the questions, shuffling 
+          the answer choices.
         - Each player is prompted with a multiple-choice question and their 
           answer is compared to the correct answer.
         - Players' scores are updated based on their responses (1 point for 
@@ -98,90 +213,102 @@ def quiz(response, player_list:list):
     Example Usage:
         >>> response = requests.get('https://opentdb.com/api.php?amount=5')
         >>> player_list = ['Alice', 'Bob']
-        >>> scores = quiz(response, player_list)
+        >>> player_list, scores = quiz(response, player_list)
         >>> print(scores)
-        {
-            'Alice': {'1': 1, '2': 0, '3': 1, '4': 1, '5': 0},
-            'Bob': {'1': 1, '2': 1, '3': 0, '4': 0, '5': 1}
-        }
+        [[1 0 1 1 0]
+         [1 1 0 0 1]]
     """
-    # prepare a dictionary to keep score
-    score = {}
-    for player in player_list:
-        score[player] = {}
-
-    # initialize counter for the questions
-    question_number = 1
-    # Parse the questions and answers from the given response
-    for item in response.json()["results"]:
-        # Get the question from the response, and clean the html entities
-        question = unescape(item["question"])
-        # Get the correct and incorrect answers from the response, and
-        # clean the html entities
-        correct_answer = unescape(item["correct_answer"])
-        choices = [unescape(choice) for choice in item["incorrect_answers"]]
+    results = response.json()["results"]
+    # prepare a matrix to keep score, one row per player and one column per 
+    # question
+    score = np.zeros((len(player_list), len(results)), dtype=np.int8)
+
+    # Parse the questions and answers from the given response, and clean the
+    # html entities of all of them before asking anything
+    prepared = [
+        (
+            unescape(item["question"]),
+            unescape(item["correct_answer"]),
+            [unescape(choice) for choice in item["incorrect_answers"]],
+        )
+        for item in results
+    ]
+
+    for question_index, (question, correct_answer, incorrect_answers) in (
+        enumerate(prepared)
+    ):
+        # Upper case version of the correct answer is the same for every 
+        # player, so do it only once
+        correct_upper = correct_answer.upper()
         # Combine the correct and incorrect answers, and shuffle
-        choices.append(correct_answer)
+        choices = incorrect_answers + [correct_answer]
         shuffle(choices)
         # Form a multiple choice question
         question_with_choices = (
             f"{question} Choices are: {', '.join(choices)}"
         )
 
-        # Ask each player the question 
-        for player in player_list: 
-            answer = input(f'{player}: {question_with_choices}\n')
-            # Check if the answer is correct, ignoring lower/upper case mistakes
-            if answer.upper() == correct_answer.upper():
-                player_points = 1
-            else:
-                player_points = 0
-            # Add the question number and points to the score dictionary
-            score[player][str(question_number)] = player_points
-        # Keep score of the question number
-        question_number += 1
+        # Ask each player the question. The answers are read straight from
+        # stdin instead of with `input()`, which makes scripted runs (answers 
+        # piped to the game) faster. The streams are looked up here, so 
+        # redirecting `sys.stdin` or `sys.stdout` works.
+        stdout = sys.stdout
+        stdin = sys.stdin
+        for player_index, player in enumerate(player_list): 
+            stdout.write(f'{player}: {question_with_choices}\n')
+            stdout.flush()
+            line = stdin.readline()
+            # Like `input()`, stop if there is nothing more to read
+            if not line:
+                raise EOFError("No more answers to read")
+            answer = line.rstrip('\n')
+            # Check if the answer is correct, ignoring lower/upper case 
+            # mistakes. The score matrix starts with zeros, so only correct
+            # answers need to be marked.
+            if answer.upper() == correct_upper:
+                score[player_index, question_index] = 1
         # Print out the correct answer
         print(f"\nCorrect answer is: {correct_answer}\n")
-    return score    
+    return player_list, score
 
 
-def calculate_winner(score):
+def calculate_winner(player_list, score):
     """
     Calculates the total scores for each player and determines the highest 
-    scorer(s). Iterates through the `score` dictionary (which stores the points
+    scorer(s). Sums the rows of the `score` matrix (which stores the points
     for each player) to compute the total score for each player. It then 
     identifies the player(s) with the highest score. If multiple players share 
     the highest score, they are all considered winners. If the highest score is 
     0, it informs the users that no points were earned.
 
+    Args:
+        player_list (list): A list of player names, in the same order as the 
+                            rows of `score`.
+        score (numpy.ndarray): The points matrix returned by `quiz`, one row 
+                               per player and one column per question.
+
     Variables:
-    highest_score (int): A variable to track the highest score found so far, 
-                         initialized to -1.
+    totals (numpy.ndarray): The total points for each player.
+    highest_score (int): The highest total score.
     persons_with_highest_score (list): A list to store the names of players 
                                        with the highest score.
-    player_point_sums (dict): A dictionary to store the total points for each 
-                              player.
 
     Flow:
-    1. Loop through each player and their respective score dictionary in the 
-       `score` dictionary.
-    2. Calculate the sum of their points.
-    3. Compare the total score with `highest_score`. If the total score is 
-       higher, update `highest_score` and reset the `persons_with_highest_score`
-       list to the current player.
-    4. If a player's total score equals the current highest score, append them 
-       to `persons_with_highest_score`.
-    5. After evaluating all players, print the player(s) with the highest score.
-    6. If the highest score is 0, print a message indicating no points were 
-       earned. Otherwise, congratulate the winners.
+    1. Sum the points of each player (each row of `score`) and find the 
+       highest total score.
+    2. If the highest score is 0 (or there are no players), print a message 
+       indicating no points were earned and stop.
+    3. Otherwise, collect the player(s) whose total score equals the highest 
+       score, print them and congratulate the winners.
 
     Example:
-    Given a `score` dictionary like this:
-        score = {
-            'Sheldon': {'1': 0, '2': 1, '3': 1},
-            'Leonard': {'1': 0, '2': 0, '3': 0},
-            'Penny': {'1': 1, '2': 1, '3': 1}
-        }
+    Given a `player_list` and `score` like this:
+        player_list = ['Sheldon', 'Leonard', 'Penny']
+        score = np.array([
+            [0, 1, 1],
+            [0, 0, 0],
+            [1, 1, 1]
+        ], dtype=np.int8)
     The output would be:
         Player(s) with the highest score (3):
         Penny
@@ -190,59 +317,69 @@ def calculate_winner(score):
     Raises:
     Prints a message if no player scores more than 0 points.
     """
-    # Initialize variable to store the highest score 
-    highest_score = -1
-    # Initialize list variable to store the persons with the highest score
-    persons_with_highest_score = []
-    # Initialize dictionary variable to store the sum of scores for each person
-    player_point_sums = {}
-    for person, scores in score.items():
-        total_score = sum(scores.values())
-        player_point_sums[person] = total_score
-        if total_score > highest_score:
-            highest_score = total_score
-            persons_with_highest_score = [person]
-        elif total_score == highest_score:
-            persons_with_highest_score.append(person)
-    # Print the results. Player cannot be a winner with 0 points.
+    # Calculate the sum of scores for each person, and the highest score. 
+    # Without any players there is no highest score either.
+    totals = score.sum(axis=1, dtype=np.int32)
+    highest_score = int(totals.max()) if totals.size else 0
+    # Player cannot be a winner with 0 points.
     if highest_score == 0:
         print("Sorry, no points. Better luck next time!")
-    else:    
-        print(f"Player(s) with the highest score ({highest_score}):")
-        for person in persons_with_highest_score:
-            print(person)
-        print("Congratulations!")
+        return
+    # Get the persons with the highest score, and print the results
+    persons_with_highest_score = [
+        player_list[i] for i in np.flatnonzero(totals == highest_score)
+    ]
+    print(f"Player(s) with the highest score ({highest_score}):")
+    print("\n".join(persons_with_highest_score))
+    print("Congratulations!")
 
 
-def write_score_to_csv(score):
+def write_score_to_csv(player_list, score, format='csv', compress=True):
     """
-    Writes player scores to a CSV file.
-
-    This function takes a dictionary of player scores, dynamically creates 
-    headers for the CSV based on the number of questions, and writes the scores
-    for each player along with their total points to the file `quiz_score.csv`.
+    Writes player scores to a CSV file, or to an Arrow (Feather v2) file.
+
+    This function takes the player names and their score matrix, dynamically
+    creates headers for the CSV based on the number of questions, and writes 
+    the scores for each player along with their total points to the file 
+    `quiz_score.csv.zst`. The file is compressed with zstd, because the scores
+    are mostly zeros and ones and compress very well. With `compress=False` 
+    the plain `quiz_score.csv` is written instead, which can be read without
+    decompressing it first. With `format='arrow'` the same table is written to
+    `quiz_score.arrow` instead, so it can be read back later with 
+    `feather.read_table()` without parsing any text.
 
     Args:
-        score (dict): A dictionary where each key is a player's name, and each 
-                      value is another dictionary that contains question 
-                      numbers as keys and points (0 or 1) as values.
-                      Example:
-                      {
-                          'Player1': {'1': 1, '2': 0, '3': 1},
-                          'Player2': {'1': 0, '2': 1, '3': 1}
-                      }
+        player_list (list): A list of player names, in the same order as the 
+                            rows of `score`.
+        score (numpy.ndarray): The points matrix returned by `quiz`, one row 
+                               per player and one column per question, with 
+                               points 0 or 1.
+                               Example:
+                               np.array([
+                                   [1, 0, 1],
+                                   [0, 1, 1]
+                               ], dtype=np.int8)
+        format (str): The file format, either 'csv' or 'arrow'. Defaults to 
+                      'csv'.
+        compress (bool): Whether to compress the file with zstd. Defaults to 
+                         True.
+
+    Raises:
+        ValueError: If `format` is not 'csv' or 'arrow'.
 
     Process:
-        1. The function dynamically generates the headers for the CSV file by 
-           inspecting the keys of the first player' score dictionary. These 
-           keys represent the question numbers.
+        1. The function dynamically generates the headers for the CSV file 
+           from the number of columns in the score matrix. Each column is one
+           question.
         2. The headers include the player's name, each question, and a 'Total' 
            column for the sum of the player's points.
-        3. The function opens the file `quiz_score.csv` in write mode and 
-           writes the headers and the player scores.
-        4. For each player, it calculates the total score (sum of the player's 
-           points) and writes the player's name, question scores, and total 
-           points to the CSV file.
+        3. For each player, it calculates the total score (sum of the row of 
+           the player's points).
+        4. The names, question scores and totals are collected into a 
+           `pyarrow.Table` column by column, and the table is written to 
+           `quiz_score.csv.zst` (or `quiz_score.csv`) with 
+           `pyarrow.csv.write_csv`, or to `quiz_score.arrow` with 
+           `feather.write_feather`.
         5. Prints a message to indicate that the CSV file has been written.
 
     CSV Structure:
@@ -251,50 +388,77 @@ def write_score_to_csv(score):
         - Each subsequent row contains the player's name, their score for each 
         question, and the total score.
     
-    Example Output in `quiz_score.csv`:
-        Name, Question 1, Question 2, Question 3, Total
-        Player1, 1, 0, 1, 2
-        Player2, 0, 1, 1, 2
+    Example Output in `quiz_score.csv` (after decompressing):
+        "Name","Question 1","Question 2","Question 3","Total"
+        "Player1",1,0,1,2
+        "Player2",0,1,1,2
 
     Prints:
-        A message indicating that the results have been written to 
-        `quiz_score.csv`.
+        A message indicating which file the results have been written to.
     """
-    # Dynamically creates the headers based on the keys of the first 
-    # person's score (all players have the same number of questions, but 
-    # the number of questions may vary). Adds'total' for the sum of points.
-    # ChatGPT AI helped with use of `iter()` and `next()`, and mixing f string
-    # with list comprehension. I didn't know that could be done!
-    questions = list(next(iter(score.values())).keys())
-    headers = ['Name'] + [f'Question {q_no}' for q_no in questions] + ['Total']
-    with open('quiz_score.csv', 'w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(headers)
-        # Write the player's name and their points into a row in the csv file
-        for person, scores in score.items():
-            # Calculate the total score by summing the values of the score 
-            # dictionary
-            total = sum(scores.values())
-            writer.writerow([person] + list(scores.values()) + [total])
-    print('You can check the results in quiz_score.csv')        
+    if format not in ('csv', 'arrow'):
+        raise ValueError(f"Unknown format {format!r}, use 'csv' or 'arrow'")
+    # Dynamically creates the headers based on the number of questions (all 
+    # players have the same number of questions, but the number of questions 
+    # may vary). Adds'total' for the sum of points.
+    no_questions = score.shape[1]
+    # Build the table column by column, so pyarrow can write the whole csv 
+    # file at once instead of writing it row by row. The transposed copy of
+    # the matrix keeps each question's points next to each other in memory.
+    question_columns = np.ascontiguousarray(score.T)
+    # Calculate the total score for each player by summing the rows
+    totals = score.sum(axis=1, dtype=np.int16)
+    table = pa.table({
+        'Name': pa.array(player_list, pa.string()),
+        **{
+            f'Question {q_no}': pa.array(question_columns[q_no - 1], pa.int8())
+            for q_no in range(1, no_questions + 1)
+        },
+        'Total': pa.array(totals, pa.int16()),
+    })
+    if format == 'arrow':
+        file_name = 'quiz_score.arrow'
+        feather.write_feather(
+            table, file_name,
+            compression='zstd' if compress else 'uncompressed'
+            )
+    elif compress:
+        file_name = 'quiz_score.csv.zst'
+        with pa.output_stream(file_name, compression='zstd') as out:
+            pacsv.write_csv(table, out)
+    else:
+        file_name = 'quiz_score.csv'
+        pacsv.write_csv(table, file_name)
+    print(f'You can check the results in {file_name}')
+    if format == 'csv' and compress:
+        print(
+            f'The file is zstd compressed, decompress it with '
+            f'`zstd -d {file_name}` to read it.'
+            )
 
 
 
 if __name__== "__main__":
 
     player_list = ["Sheldon", "Leonard", "Penny"]
-    response = get_questions(4)
+    response = get_questions(4, use_cache=True)
+    if response.status_code != 200:
+        print(
+            f"Something went wrong! Didn't get the questions, got status code "
+            f"{response.status_code}"
+            )
     print(
         f"\nResponse printed pretty: " 
         f"\n{json.dumps(response.json(), indent=2, sort_keys=True)}\n"
         )
-    score = quiz(response, player_list)
+    player_list, score = quiz(response, player_list)
     print(score)
     
-    # score = {
-    #     'Sheldon': {'1': 0, '2': 1, '3': 1, '4': 1}, 
-    #     'Leonard': {'1': 0, '2': 0,'3': 1, '4': 1}, 
-    #     'Penny': {'1': 1, '2': 1, '3': 1, '4': 1}}
+    # score = np.array([
+    #     [0, 1, 1, 1], 
+    #     [0, 0, 1, 1], 
+    #     [1, 1, 1, 1]], dtype=np.int8)
     
-    calculate_winner(score)
-    write_score_to_csv(score)
\ No newline at end of file
+    calculate_winner(player_list, score)
+    write_score_to_csv(player_list, score)
+    write_score_to_csv(player_list, score, format='arrow')
\ No newline at end of file